@@ -1,9 +1,19 @@
-import pandas as pd
-import numpy as np
+from startup_profile import StartupProfiler
+from capture import PredictionCapture
+
+import os
+import threading
+import traceback
 import pickle as pkl
-import uvicorn
 
-from fastapi import FastAPI, Request
+from concurrent.futures import Future
+
+# heavy modules (pandas, sklearn, xgboost, uvicorn) are imported lazily and timed by the profiler
+profiler = StartupProfiler()
+profiler.timed_import("pydantic")
+profiler.timed_import("fastapi")
+
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 
 
@@ -31,15 +41,276 @@ class PredicionOutput(BaseModel):
     text: str
 
 
+class SingleFlight:
+    """
+    Deduplicates identical in-flight calls, so concurrent callers with the same key share one computation.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialisation function.
+        """
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key: tuple, function, *args):
+        """
+        Runs function for the given key, or waits for the result of an identical call already in progress.
+
+        Args:
+            key (tuple): Hashable key identifying the call.
+            function (callable): Function to run if no identical call is in progress.
+
+        Returns:
+            Result of the function call.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            # future is always resolved, otherwise followers would wait forever
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return future.result()
+
+
+# "full" serves the pickled sklearn pipeline, "lite" serves exported spec with NumPy and XGBoost booster only
+STARTUP_MODE = os.environ.get("APP_STARTUP_MODE", "full")
+STARTUP_REPORT_PATH = os.environ.get("STARTUP_REPORT_PATH")
+
+# sampled input capture for retraining, disabled unless sample rate is above 0
+CAPTURE_SAMPLE_RATE = float(os.environ.get("CAPTURE_SAMPLE_RATE", 0.0))
+CAPTURE_BUFFER_SIZE = int(os.environ.get("CAPTURE_BUFFER_SIZE", 10000))
+CAPTURE_BATCH_SIZE = int(os.environ.get("CAPTURE_BATCH_SIZE", 1000))
+CAPTURE_FLUSH_SECONDS = float(os.environ.get("CAPTURE_FLUSH_SECONDS", 60))
+CAPTURED_DATA_PATH = os.environ.get("CAPTURED_DATA_PATH", "./captured_data/")
+SHADOW_MODEL_PATH = os.environ.get("SHADOW_MODEL_PATH")
+
+if STARTUP_MODE not in ("full", "lite"):
+    raise ValueError(f"APP_STARTUP_MODE must be 'full' or 'lite', got {STARTUP_MODE!r}")
+
+if STARTUP_MODE == "lite" and CAPTURE_SAMPLE_RATE > 0:
+    raise ValueError("Input capture writes parquet files with pandas and is not available in lite startup mode")
+
+# modules the pickled pipeline needs, imported before unpickling so import and model load times are reported apart
+FULL_MODEL_MODULES = (
+    "numpy",
+    "pandas",
+    "sklearn",
+    "sklearn.preprocessing",
+    "sklearn.model_selection",
+    "sklearn.pipeline",
+    "sklearn.compose",
+    "xgboost",
+)
+
+# number of warm-up passes and synthetic batch size used before /health reports ready
+WARMUP_ROUNDS = int(os.environ.get("WARMUP_ROUNDS", 3))
+WARMUP_BATCH_SIZE = int(os.environ.get("WARMUP_BATCH_SIZE", 16))
+
+WARMUP_INPUTS = [
+    PredictionInput(
+        VendorID=1,
+        passenger_count=6,
+        trip_distance=2.2,
+        RatecodeID=3,
+        store_and_fwd_flag="N",
+        PULocationID=234,
+        DOLocationID=249,
+        payment_type=2,
+        tolls_amount=0,
+        is_weekend=True,
+        weekday="Saturday",
+        is_business_hours=False,
+        time_of_day="Morning",
+    ),
+    PredictionInput(
+        VendorID=2,
+        passenger_count=1,
+        trip_distance=11.4,
+        RatecodeID=2,
+        store_and_fwd_flag="Y",
+        PULocationID=132,
+        DOLocationID=161,
+        payment_type=1,
+        tolls_amount=1,
+        is_weekend=False,
+        weekday="Friday",
+        is_business_hours=True,
+        time_of_day="Afternoon",
+    ),
+    PredictionInput(
+        VendorID=2,
+        passenger_count=2,
+        trip_distance=0.9,
+        RatecodeID=1,
+        store_and_fwd_flag="N",
+        PULocationID=237,
+        DOLocationID=236,
+        payment_type=1,
+        tolls_amount=0,
+        is_weekend=False,
+        weekday="Monday",
+        is_business_hours=False,
+        time_of_day="Night",
+    ),
+]
+
+
 app = FastAPI(title="Trip Duration Prediction APP")
+app.is_ready = False
+app.single_flight = SingleFlight()
+app.capture = PredictionCapture(
+    sample_rate=CAPTURE_SAMPLE_RATE,
+    buffer_size=CAPTURE_BUFFER_SIZE,
+    batch_size=CAPTURE_BATCH_SIZE,
+    flush_interval_seconds=CAPTURE_FLUSH_SECONDS,
+    captured_data_path=CAPTURED_DATA_PATH,
+    shadow_model_path=SHADOW_MODEL_PATH,
+)
+
+
+def input_to_record(input: PredictionInput) -> dict:
+    """
+    Converts prediction input into a single record used to build the model dataframe.
+
+    Args:
+        input (PredictionInput): dictionary of features, used for prediction.
+
+    Returns:
+        dict: record of feature names and values.
+    """
+    return {
+        "VendorID": input.VendorID,
+        "passenger_count": input.passenger_count,
+        "trip_distance": input.trip_distance,
+        "RatecodeID": input.RatecodeID,
+        "store_and_fwd_flag": input.store_and_fwd_flag,
+        "PULocationID": input.PULocationID,
+        "DOLocationID": input.DOLocationID,
+        "payment_type": input.payment_type,
+        "tolls_amount": input.tolls_amount,
+        "is_weekend": input.is_weekend,
+        "weekday": input.weekday,
+        "is_business_hours": input.is_business_hours,
+        "time_of_day": input.time_of_day,
+    }
+
+
+def predict_records(records: list):
+    """
+    Runs the model on a list of records, using pandas only when serving the full pipeline.
+
+    Args:
+        records (list): list of records of feature names and values.
+
+    Returns:
+        np.ndarray: predicted durations of the trips.
+    """
+    if STARTUP_MODE == "lite":
+        return app.model.predict(records)
+
+    import pandas as pd
+
+    return app.model.predict(pd.DataFrame(records))
+
+
+def predict_record(record: dict):
+    """
+    Runs the model on a single record.
+
+    Args:
+        record (dict): record of feature names and values.
+
+    Returns:
+        np.ndarray: predicted duration of the trip.
+    """
+    return predict_records([record])
+
+
+def warm_up_model(
+    rounds: int = WARMUP_ROUNDS, batch_size: int = WARMUP_BATCH_SIZE
+) -> None:
+    """
+    Runs representative synthetic batches and single records through the model,
+    so lazy initialisation in the model stack is paid before serving traffic.
+
+    Args:
+        rounds (int, optional): Number of warm-up passes. Defaults to WARMUP_ROUNDS.
+        batch_size (int, optional): Number of rows in each synthetic batch. Defaults to WARMUP_BATCH_SIZE.
+    """
+    records = [input_to_record(input) for input in WARMUP_INPUTS]
+    batch = [records[i % len(records)] for i in range(max(batch_size, 1))]
+
+    for _ in range(rounds):
+        predict_records(batch)
+        for record in records:
+            predict_record(record)
+
+
+def complete_startup() -> None:
+    """
+    Warms up the model and marks the API ready, emitting startup timing report.
+    Runs in background thread after server startup, so /health reports not ready over HTTP until it completes.
+    """
+    try:
+        with profiler.track("warm_up"):
+            warm_up_model()
+    except Exception as e:
+        # API stays not ready, report shows why readiness never arrived
+        traceback.print_exc()
+        profiler.record_failure("warm_up", e)
+        profiler.emit_report(STARTUP_REPORT_PATH)
+        return
+
+    app.is_ready = True
+    profiler.mark_ready()
+    profiler.emit_report(STARTUP_REPORT_PATH)
 
 
 @app.on_event("startup")
 def load_model():
     """
-    Loads XGBoost regressor model used for predictions.
+    Loads XGBoost regressor model used for predictions and starts its warm-up in background.
+    Modules needed by the pickled pipeline are imported first, so their time is reported as imports;
+    any other module imported while unpickling is counted in model_load.
     """
-    app.model = pkl.load(open("model/xgb_v2_for_api.pickle", "rb"))
+    if STARTUP_MODE == "lite":
+        for module_name in ("numpy", "xgboost"):
+            profiler.timed_import(module_name)
+        LiteModel = profiler.timed_import("lite_model").LiteModel
+        with profiler.track("model_load"):
+            app.model = LiteModel()
+    else:
+        for module_name in FULL_MODEL_MODULES:
+            profiler.timed_import(module_name)
+        with profiler.track("model_load"):
+            app.model = pkl.load(open("model/xgb_v2_for_api.pickle", "rb"))
+
+    threading.Thread(target=complete_startup, name="model-warm-up", daemon=True).start()
+
+    app.capture.start()
+
+
+@app.on_event("shutdown")
+def stop_capture():
+    """
+    Stops capture writer, flushing captured inputs left in memory.
+    """
+    app.capture.stop()
 
 
 @app.get("/")
@@ -54,16 +325,42 @@ def greet():
 
 
 @app.get("/health", response_model=Health)
-def health():
+def health(response: Response):
     """
     Get method to retrieve info if predictor is available.
 
     Returns:
-        str: 1 if API is available.
+        str: 1 if API is available, 0 (with 503 status code) while the model is loading or warming up.
     """
+    if not app.is_ready:
+        response.status_code = 503
+        return Health(status=0)
+
     return Health(status=1)
 
 
+@app.get("/startup_report")
+def startup_report():
+    """
+    Get method to retrieve startup timing report.
+
+    Returns:
+        dict: per-module import times, model load and warm-up times and time to ready in seconds.
+    """
+    return profiler.report()
+
+
+@app.get("/capture_stats")
+def capture_stats():
+    """
+    Get method to retrieve input capture statistics.
+
+    Returns:
+        dict: captured, dropped and written row counts and mean request-path capture overhead in microseconds.
+    """
+    return app.capture.report()
+
+
 @app.post("/predict_single")
 def model_predict(input: PredictionInput):
     """
@@ -88,26 +385,17 @@ def model_predict(input: PredictionInput):
     Returns:
         str: predicted duration of the trip.
     """
-    record = {
-        "VendorID": input.VendorID,
-        "passenger_count": input.passenger_count,
-        "trip_distance": input.trip_distance,
-        "RatecodeID": input.RatecodeID,
-        "store_and_fwd_flag": input.store_and_fwd_flag,
-        "PULocationID": input.PULocationID,
-        "DOLocationID": input.DOLocationID,
-        "payment_type": input.payment_type,
-        "tolls_amount": input.tolls_amount,
-        "is_weekend": input.is_weekend,
-        "weekday": input.weekday,
-        "is_business_hours": input.is_business_hours,
-        "time_of_day": input.time_of_day,
-    }
+    record = input_to_record(input)
+
+    # identical concurrent inputs share a single model call
+    prediction = app.single_flight.do(tuple(record.values()), predict_record, record)
 
-    df = pd.DataFrame(record, index=[0])
+    if app.capture.enabled:
+        app.capture.capture(record, prediction)
 
-    return PredicionOutput(text=str(app.model.predict(df)))
+    return PredicionOutput(text=str(prediction))
 
 
 if __name__ == "__main__":
+    uvicorn = profiler.timed_import("uvicorn")
     uvicorn.run(app, host="0.0.0.0", workers=1)
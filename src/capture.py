@@ -0,0 +1,294 @@
+import os
+import time
+import random
+import threading
+import traceback
+import pickle as pkl
+
+from collections import deque
+from datetime import datetime as dt
+
+# column order of datasets saved by Transformer, used so captured data can feed the training pipeline
+TRANSFORMED_COLUMNS = [
+    "VendorID",
+    "passenger_count",
+    "trip_distance",
+    "RatecodeID",
+    "store_and_fwd_flag",
+    "PULocationID",
+    "DOLocationID",
+    "payment_type",
+    "tolls_amount",
+    "trip_duration_minutes",
+    "is_weekend",
+    "weekday",
+    "is_business_hours",
+    "time_of_day",
+    "year",
+]
+
+# dtypes of datasets saved by Transformer, so captured and transformed parquet files share one schema
+TRANSFORMED_DTYPES = {
+    "VendorID": "int64",
+    "passenger_count": "float64",
+    "trip_distance": "float64",
+    "RatecodeID": "float64",
+    "store_and_fwd_flag": "object",
+    "PULocationID": "int64",
+    "DOLocationID": "int64",
+    "payment_type": "int64",
+    "tolls_amount": "float64",
+    "trip_duration_minutes": "float64",
+    "is_weekend": "bool",
+    "weekday": "object",
+    "is_business_hours": "bool",
+    "time_of_day": "object",
+    "year": "int64",
+}
+
+
+class PredictionCapture:
+    """
+    Samples prediction inputs into a bounded in-memory ring buffer on the request path,
+    and flushes them in batches with predictions to rolling parquet files from a background writer.
+    Optional shadow model is scored by the writer, off the request path.
+    Writer imports pandas to save parquet files, so capture is not available in lite startup mode.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        buffer_size: int = 10000,
+        batch_size: int = 1000,
+        flush_interval_seconds: float = 60.0,
+        captured_data_path: str = "./captured_data/",
+        shadow_model_path: str = None,
+    ) -> None:
+        """
+        Initialisation function.
+
+        Args:
+            sample_rate (float, optional): Share of requests to capture, between 0 and 1. Defaults to 0.0.
+            buffer_size (int, optional): Maximum number of captured rows held in memory, oldest are dropped when full. Defaults to 10000.
+            batch_size (int, optional): Number of buffered rows which triggers an early flush. Defaults to 1000.
+            flush_interval_seconds (float, optional): Maximum number of seconds between flushes. Defaults to 60.0.
+            captured_data_path (str, optional): Folder to save captured parquet files to. Defaults to "./captured_data/".
+            shadow_model_path (str, optional): Path to pickled shadow model scored on captured rows. Defaults to None.
+        """
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.captured_data_path = captured_data_path
+        self.shadow_model_path = shadow_model_path
+        self.shadow_model = None
+
+        self._buffer = deque(maxlen=buffer_size)
+        self._flush_requested = threading.Event()
+        self._stop_requested = threading.Event()
+        self._writer = None
+        self._file_number = 0
+        self._stats_lock = threading.Lock()
+        self.last_error = None
+
+        self.stats = {
+            "captured": 0,
+            "dropped": 0,
+            "written": 0,
+            "files": 0,
+            "write_failed": 0,
+            "capture_calls": 0,
+            "capture_nanoseconds": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Returns:
+            bool: True if any traffic is sampled.
+        """
+        return self.sample_rate > 0
+
+    def capture(self, record: dict, prediction) -> None:
+        """
+        Samples record and its prediction into the ring buffer. Called on the request path, so does no I/O.
+
+        Args:
+            record (dict): record of feature names and values.
+            prediction: model prediction for the record.
+        """
+        start = time.perf_counter_ns()
+        is_sampled = random.random() < self.sample_rate
+        is_dropped = False
+
+        if is_sampled:
+            is_dropped = len(self._buffer) == self._buffer.maxlen
+            self._buffer.append((time.time(), record, prediction))
+
+            if len(self._buffer) >= self.batch_size:
+                self._flush_requested.set()
+
+        # called from several threadpool workers, counters are updated under lock
+        with self._stats_lock:
+            self.stats["captured"] += is_sampled
+            self.stats["dropped"] += is_dropped
+            self.stats["capture_calls"] += 1
+            self.stats["capture_nanoseconds"] += time.perf_counter_ns() - start
+
+    def start(self) -> None:
+        """
+        Starts background writer thread, if capture is enabled.
+        """
+        if not self.enabled or self._writer is not None:
+            return
+
+        self._stop_requested.clear()
+        self._writer = threading.Thread(
+            target=self._run_writer, name="prediction-capture-writer", daemon=True
+        )
+        self._writer.start()
+
+    def stop(self) -> None:
+        """
+        Stops background writer thread, flushing rows left in the buffer.
+        """
+        if self._writer is None:
+            return
+
+        self._stop_requested.set()
+        self._flush_requested.set()
+        self._writer.join()
+        self._writer = None
+
+    def report(self) -> dict:
+        """
+        Creates capture statistics report.
+
+        Returns:
+            dict: capture counters and mean request-path overhead in microseconds.
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        calls = stats["capture_calls"]
+        return {
+            "sample_rate": self.sample_rate,
+            "buffered": len(self._buffer),
+            "captured": stats["captured"],
+            "dropped": stats["dropped"],
+            "written": stats["written"],
+            "files": stats["files"],
+            "write_failed": stats["write_failed"],
+            "last_error": self.last_error,
+            "shadow_model": self.shadow_model_path,
+            "mean_capture_overhead_microseconds": round(
+                stats["capture_nanoseconds"] / calls / 1000, 3
+            )
+            if calls
+            else None,
+        }
+
+    def _run_writer(self) -> None:
+        """
+        Background writer loop, flushes buffer on interval, when batch size is reached and on stop.
+        """
+        if self.shadow_model_path:
+            try:
+                self.shadow_model = pkl.load(open(self.shadow_model_path, "rb"))
+            except Exception as e:
+                print(f"shadow model could not be loaded: {e}")
+
+        while not self._stop_requested.is_set():
+            self._flush_requested.wait(timeout=self.flush_interval_seconds)
+            self._flush_requested.clear()
+            self._safe_flush()
+
+        self._safe_flush()
+
+    def _safe_flush(self) -> None:
+        """
+        Flushes buffer, so an unexpected error is logged and does not stop the writer loop.
+        """
+        try:
+            self.flush()
+        except Exception as e:
+            traceback.print_exc()
+            self.last_error = repr(e)
+
+    def _drain(self) -> list:
+        """
+        Removes all rows currently held in the buffer.
+
+        Returns:
+            list: captured rows of (timestamp, record, prediction).
+        """
+        rows = []
+        while True:
+            try:
+                rows.append(self._buffer.popleft())
+            except IndexError:
+                return rows
+
+    def flush(self) -> None:
+        """
+        Writes buffered rows to a new parquet file.
+        Rows which could not be written are counted as write_failed and the error is kept for the report.
+        """
+        rows = self._drain()
+        if not rows:
+            return
+
+        try:
+            self._write_rows(rows)
+        except Exception as e:
+            traceback.print_exc()
+            self.last_error = repr(e)
+            with self._stats_lock:
+                self.stats["write_failed"] += len(rows)
+            return
+
+        with self._stats_lock:
+            self.stats["written"] += len(rows)
+            self.stats["files"] += 1
+
+    def _write_rows(self, rows: list) -> None:
+        """
+        Writes rows to a new parquet file in transformed data schema,
+        extended with model (and shadow model) predictions.
+        Trip duration target is unknown at prediction time and is left empty.
+
+        Args:
+            rows (list): captured rows of (timestamp, record, prediction).
+        """
+        import numpy as np
+        import pandas as pd
+
+        dataframe = pd.DataFrame([record for _, record, _ in rows])
+        dataframe["trip_duration_minutes"] = np.nan
+        dataframe["year"] = [dt.fromtimestamp(timestamp).year for timestamp, _, _ in rows]
+        dataframe = dataframe[TRANSFORMED_COLUMNS].astype(TRANSFORMED_DTYPES)
+
+        # parquet stores timestamps in microseconds, finer precision would fail the write
+        dataframe["captured_at"] = pd.to_datetime(
+            [timestamp for timestamp, _, _ in rows], unit="s"
+        ).floor("us")
+        dataframe["predicted_trip_duration_minutes"] = [
+            float(np.ravel(prediction)[0]) for _, _, prediction in rows
+        ]
+
+        if self.shadow_model is not None:
+            try:
+                features = dataframe[
+                    [column for column in TRANSFORMED_COLUMNS if column not in ("trip_duration_minutes", "year")]
+                ]
+                dataframe["shadow_predicted_trip_duration_minutes"] = self.shadow_model.predict(features)
+            except Exception as e:
+                print(f"shadow model scoring failed: {e}")
+
+        if not os.path.isdir(self.captured_data_path):
+            os.makedirs(self.captured_data_path)
+            print("captured data folder is created")
+
+        self._file_number += 1
+        file_name = f"captured_{dt.now().strftime('%Y-%m-%d_%H%M%S')}_{self._file_number}.parquet"
+
+        dataframe.to_parquet(os.path.join(self.captured_data_path, file_name))
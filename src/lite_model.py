@@ -0,0 +1,258 @@
+import os
+import json
+import pickle as pkl
+import numpy as np
+
+
+class LiteModel:
+    """
+    Serves the trained pipeline using only NumPy and the XGBoost booster.
+    Pre-processing is replayed from a serialized spec, so pandas and sklearn are not needed.
+    Note: xgboost imports pandas and sklearn whenever they are installed, install requirements-lite.txt to skip them.
+    """
+
+    def __init__(
+        self,
+        spec_path: str = "model/xgb_v2_for_api_spec.json",
+        booster_path: str = "model/xgb_v2_for_api_booster.json",
+    ) -> None:
+        """
+        Initialisation function.
+
+        Args:
+            spec_path (str, optional): Path to serialized pre-processing spec. Defaults to "model/xgb_v2_for_api_spec.json".
+            booster_path (str, optional): Path to saved XGBoost booster. Defaults to "model/xgb_v2_for_api_booster.json".
+        """
+        import xgboost
+
+        with open(spec_path, "r") as handler:
+            self.spec = json.load(handler)
+
+        self.booster = xgboost.Booster()
+        self.booster.load_model(booster_path)
+
+        self.n_features = 0
+        self._blocks = []
+        for block in self.spec["transformers"]:
+            if block["type"] == "standard_scaler":
+                self._blocks.append(
+                    {
+                        "type": "standard_scaler",
+                        "columns": block["columns"],
+                        "offset": self.n_features,
+                        "mean": np.array(block["mean"], dtype=np.float64),
+                        "scale": np.array(block["scale"], dtype=np.float64),
+                    }
+                )
+                self.n_features += len(block["columns"])
+                continue
+
+            # per column lookup of category -> feature index, dropped binary category encodes as all zeros
+            positions, dropped = [], []
+            for categories, drop_idx in zip(block["categories"], block["drop_idx"]):
+                column_positions = {}
+                for index, category in enumerate(categories):
+                    if index == drop_idx:
+                        continue
+                    column_positions[category] = self.n_features
+                    self.n_features += 1
+                positions.append(column_positions)
+                dropped.append(None if drop_idx is None else categories[drop_idx])
+
+            self._blocks.append(
+                {
+                    "type": "one_hot",
+                    "columns": block["columns"],
+                    "positions": positions,
+                    "dropped": dropped,
+                }
+            )
+
+        self.selected_features = self.spec.get("selected_features")
+        self.zero_is_missing = self.spec.get("sparse_output", False)
+
+    def transform(self, records: list) -> np.ndarray:
+        """
+        Encodes records the same way as the pickled pipeline pre-processor.
+
+        Args:
+            records (list): list of dictionaries of feature names and values.
+
+        Raises:
+            ValueError: if record contains category unseen during training.
+
+        Returns:
+            np.ndarray: encoded feature matrix.
+        """
+        features = np.zeros((len(records), self.n_features), dtype=np.float32)
+
+        for row, record in enumerate(records):
+            for block in self._blocks:
+                columns = block["columns"]
+                if block["type"] == "standard_scaler":
+                    offset = block["offset"]
+                    values = np.array([record[column] for column in columns], dtype=np.float64)
+                    features[row, offset : offset + len(columns)] = (
+                        values - block["mean"]
+                    ) / block["scale"]
+                    continue
+
+                for column, positions, dropped in zip(
+                    columns, block["positions"], block["dropped"]
+                ):
+                    value = record[column]
+                    if value in positions:
+                        features[row, positions[value]] = 1.0
+                    elif dropped is None or value != dropped:
+                        raise ValueError(f"Found unknown category {value!r} in column {column}")
+
+        if self.selected_features is not None:
+            features = features[:, self.selected_features]
+
+        if self.zero_is_missing:
+            # pipeline was trained on sparse matrices, where XGBoost treats absent entries as missing
+            features[features == 0] = np.nan
+
+        return features
+
+    def predict(self, records: list) -> np.ndarray:
+        """
+        Predicts trip duration for records.
+
+        Args:
+            records (list): list of dictionaries of feature names and values.
+
+        Returns:
+            np.ndarray: predicted trip durations.
+        """
+        return self.booster.inplace_predict(self.transform(records))
+
+
+def generate_validation_records(spec: dict, number_of_records: int = 200) -> list:
+    """
+    Generates synthetic records covering every category and a range of numeric values of the spec.
+
+    Args:
+        spec (dict): Serialized pre-processing spec.
+        number_of_records (int, optional): Number of records to generate. Defaults to 200.
+
+    Returns:
+        list: list of dictionaries of feature names and values.
+    """
+    rng = np.random.default_rng(999)
+    records = [{} for _ in range(number_of_records)]
+
+    for block in spec["transformers"]:
+        for index, column in enumerate(block["columns"]):
+            for row, record in enumerate(records):
+                if block["type"] == "one_hot":
+                    categories = block["categories"][index]
+                    record[column] = categories[(row + index) % len(categories)]
+                else:
+                    record[column] = float(rng.gamma(2.0, 2.0))
+
+    return records
+
+
+def export_lite_model(
+    pickle_path: str = "model/xgb_v2_for_api.pickle",
+    spec_path: str = "model/xgb_v2_for_api_spec.json",
+    booster_path: str = "model/xgb_v2_for_api_booster.json",
+    tolerance: float = 1e-3,
+) -> None:
+    """
+    Serializes pre-processing of the pickled pipeline into json spec and saves its XGBoost booster,
+    so it can be served by LiteModel. Requires sklearn and pandas, used only at export time.
+
+    Args:
+        pickle_path (str, optional): Path to pickled model. Defaults to "model/xgb_v2_for_api.pickle".
+        spec_path (str, optional): Path to save pre-processing spec to. Defaults to "model/xgb_v2_for_api_spec.json".
+        booster_path (str, optional): Path to save booster to. Defaults to "model/xgb_v2_for_api_booster.json".
+        tolerance (float, optional): Maximum absolute difference in minutes allowed between lite and pickled model predictions. Defaults to 1e-3.
+
+    Raises:
+        ValueError: if pipeline contains a transformer which is not supported,
+                    or lite model predictions differ from pickled model predictions.
+    """
+    model = pkl.load(open(pickle_path, "rb"))
+    pipeline = getattr(model, "best_estimator_", model)
+
+    column_transformer = pipeline.steps[0][1]
+    while hasattr(column_transformer, "steps"):
+        column_transformer = column_transformer.steps[0][1]
+
+    transformers = []
+    for name, transformer, columns in column_transformer.transformers_:
+        if name == "remainder" or transformer == "drop":
+            continue
+
+        encoder = transformer.steps[-1][1] if hasattr(transformer, "steps") else transformer
+        columns = list(columns)
+
+        if hasattr(encoder, "categories_"):
+            drop_idx = encoder.drop_idx_
+            transformers.append(
+                {
+                    "type": "one_hot",
+                    "columns": columns,
+                    "categories": [categories.tolist() for categories in encoder.categories_],
+                    "drop_idx": [None] * len(columns)
+                    if drop_idx is None
+                    else [None if index is None else int(index) for index in drop_idx],
+                }
+            )
+        elif hasattr(encoder, "with_mean") and hasattr(encoder, "with_std"):
+            # sklearn fills mean_ even when with_mean=False, but only subtracts it when with_mean=True
+            transformers.append(
+                {
+                    "type": "standard_scaler",
+                    "columns": columns,
+                    "mean": encoder.mean_.tolist()
+                    if encoder.with_mean
+                    else [0.0] * len(columns),
+                    "scale": encoder.scale_.tolist()
+                    if encoder.with_std
+                    else [1.0] * len(columns),
+                }
+            )
+        else:
+            raise ValueError(f"Transformer {name} is not supported by lite model")
+
+    selected_features = None
+    for _, step in pipeline.steps[1:-1]:
+        if hasattr(step, "support_"):
+            selected_features = np.flatnonzero(step.support_).tolist()
+
+    spec = {
+        "transformers": transformers,
+        "selected_features": selected_features,
+        "sparse_output": bool(getattr(column_transformer, "sparse_output_", False)),
+    }
+
+    with open(spec_path, "w") as handler:
+        json.dump(spec, handler, indent=2)
+
+    pipeline.steps[-1][1].get_booster().save_model(booster_path)
+
+    # exported model is only kept if it scores the same as the pickled model
+    import pandas as pd
+
+    records = generate_validation_records(spec)
+    difference = np.max(
+        np.abs(
+            LiteModel(spec_path, booster_path).predict(records)
+            - model.predict(pd.DataFrame(records))
+        )
+    )
+    if difference > tolerance:
+        os.remove(spec_path)
+        os.remove(booster_path)
+        raise ValueError(
+            f"Lite model predictions differ from pickled model by up to {difference:.6f}, export removed"
+        )
+
+    print(f"lite model saved to {spec_path} and {booster_path}, max prediction difference {difference:.6f}")
+
+
+if __name__ == "__main__":
+    export_lite_model()
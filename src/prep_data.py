@@ -7,6 +7,8 @@ from transformer import Transformer
 class DataPreparation:
     """
     Class used to orchestrate data extraction and transformation.
+    Only yellow taxi datasets are transformed, as Transformer expects yellow tpep_* columns
+    and names its output by year-month only.
     """
 
     def __init__(
@@ -42,6 +44,9 @@ class DataPreparation:
         )
 
         for dataset in os.listdir(self.raw_data_path):
+            if not dataset.startswith("yellow_tripdata_"):
+                print(f"{dataset} is not a yellow taxi dataset, skipping transformation")
+                continue
             Transformer(
                 file_name=dataset, transofmed_data_path=self.transformed_data_path
             ).transform_data()
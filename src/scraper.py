@@ -1,9 +1,16 @@
 import os
+import re
+import json
 import time
 import requests
 import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup, ResultSet
+from bs4 import BeautifulSoup, ResultSet, SoupStrainer
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+# matches dataset file names such as yellow_tripdata_2021-12.parquet
+DATASET_FILE_PATTERN = re.compile(r"(yellow|green|fhvhv|fhv)_tripdata_(\d{4}-\d{2})\.parquet$")
 
 
 class Scraper:
@@ -19,6 +26,11 @@ class Scraper:
         scraping_end_year: str = "2022-01",
         title_of_parquet_file: str = "scraped_yellow_city_taxi_file",
         timeout: int = 1,
+        trip_types: list = ["yellow"],
+        months: list = ["12"],
+        additional_index_urls: list = [],
+        index_cache_path: str = "./tlc_index_cache.json",
+        request_timeout: int = 30,
     ) -> None:
         """ 
         Initialisation function.
@@ -31,63 +43,153 @@ class Scraper:
             scraping_end_year (str, optional): End year to extract data to. Defaults to "2022-01".
             title_of_parquet_file (str, optional): start file name to save retrieve data to. Defaults to "scraped_yellow_city_taxi_file".
             timeout (int, optional): Number of seconds between each scraping action. Defaults to 1.
+            trip_types (list, optional): Trip types to download: yellow, green, fhv or fhvhv. Defaults to ["yellow"].
+            months (list, optional): Months (mm) of each year to download. Defaults to ["12"].
+            additional_index_urls (list, optional): Other pages listing datasets, discovered in parallel with the main page. Defaults to [].
+            index_cache_path (str, optional): Path of the persistent index cache. Defaults to "./tlc_index_cache.json".
+            request_timeout (int, optional): Number of seconds to wait for index page response. Defaults to 30.
         """        
         self.header = {id: web_browser}
-        self.url_for_scraping = general_url_for_monthly_data
         self.title_of_parquet_file = title_of_parquet_file
         self.timeout = timeout
         self.start_date = scraping_start_year
         self.end_date = scraping_end_year
+        self.trip_types = list(trip_types)
+        self.months = {str(month).zfill(2) for month in months}
+        self.index_urls = [general_url_for_monthly_data] + list(additional_index_urls)
+        self.index_cache_path = index_cache_path
+        self.request_timeout = request_timeout
         self._datasets_to_download = []
 
-    def get_page_response(self, url: str, header: dict) -> BeautifulSoup:
+    def load_index_cache(self) -> dict:
+        """
+        Loads persistent index cache, keyed by page URL.
+
+        Returns:
+            dict: cached ETag, Last-Modified and dataset index of each page.
+        """
+        if not os.path.isfile(self.index_cache_path):
+            return {}
+
+        try:
+            with open(self.index_cache_path, "r") as handler:
+                return json.load(handler)
+        except (OSError, ValueError) as e:
+            print(e)
+            return {}
+
+    def save_index_cache(self, cache: dict) -> None:
         """
-        Checks if page is responsive and gets the connection.
-        
+        Saves index cache to disk.
+
         Args:
-            url (str): Page URL to retrieve data
-            header (dict): Combination of ID and web-berowser
+            cache (dict): cached ETag, Last-Modified and dataset index of each page.
+        """
+        with open(self.index_cache_path, "w") as handler:
+            json.dump(cache, handler, indent=2)
+
+    def parse_dataset_index(self, html: str, url: str) -> dict:
+        """
+        Parses links of the page into dataset index.
+
+        Args:
+            html (str): Page html.
+            url (str): Page URL, used to resolve relative links.
 
         Returns:
-            BeautifulSoup object
-        """        
-        self.response = requests.get(url, headers=header)
+            dict: dataset links keyed by trip type and year-month, e.g. {"yellow": {"2021-12": link}}.
+        """
+        index = {}
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a", href=True))
 
-        soup = BeautifulSoup(self.response.text, "html.parser")
-        if not self.response.ok:
-            print(f"You've received {self.response} error")
-        else:
-            return soup
+        for link in soup.find_all("a", href=True):
+            href = link["href"].strip()
+            match = DATASET_FILE_PATTERN.search(href)
+            if match:
+                trip_type, year_month = match.groups()
+                index.setdefault(trip_type, {})[year_month] = urljoin(url, href)
 
-    def collect_all_datasets_to_download(self) -> list:
+        return index
+
+    def fetch_page_index(self, url: str, cached_entry: dict) -> dict:
+        """
+        Retrieves dataset index of the page, using conditional GET so unchanged page is not downloaded and parsed again.
+
+        Args:
+            url (str): Page URL to retrieve data.
+            cached_entry (dict): cached ETag, Last-Modified and index of the page, empty if not cached.
+
+        Returns:
+            dict: ETag, Last-Modified and dataset index of the page, cached entry if page could not be retrieved.
+        """
+        header = dict(self.header)
+        if cached_entry.get("etag"):
+            header["If-None-Match"] = cached_entry["etag"]
+        if cached_entry.get("last_modified"):
+            header["If-Modified-Since"] = cached_entry["last_modified"]
+
+        try:
+            response = requests.get(url, headers=header, timeout=self.request_timeout)
+        except requests.RequestException as e:
+            # unreachable page falls back to its cached index and does not stop other pages
+            print(e)
+            return cached_entry
+
+        if response.status_code == 304 and "index" in cached_entry:
+            return cached_entry
+        if not response.ok:
+            print(f"You've received {response} error")
+            return cached_entry
+
+        return {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "index": self.parse_dataset_index(response.text, url),
+        }
+
+    def collect_all_datasets_to_download(self) -> dict:
         """
-        Extracts all datasets names from scraped web page html
+        Collects index of all datasets possible to download from index pages, fetched in parallel.
+        Index is cached on disk and pages are only parsed again when they have changed.
 
         Returns:
-            list: list of all dataset names possible to download.
+            dict: dataset links keyed by trip type and year-month.
         """
-        soup = self.get_page_response(url=self.url_for_scraping, header=self.header)
+        cache = self.load_index_cache()
 
-        all_downloadable_files = soup.find_all(
-            "a", title="Yellow Taxi Trip Records", href=True
-        )
+        with ThreadPoolExecutor(max_workers=len(self.index_urls)) as executor:
+            entries = list(
+                executor.map(
+                    lambda url: self.fetch_page_index(url, cache.get(url, {})),
+                    self.index_urls,
+                )
+            )
 
-        return [dataset["href"] for dataset in all_downloadable_files]
+        index = {}
+        for url, entry in zip(self.index_urls, entries):
+            if entry:
+                cache[url] = entry
+            for trip_type, links in entry.get("index", {}).items():
+                index.setdefault(trip_type, {}).update(links)
+
+        self.save_index_cache(cache)
+
+        return index
 
     def generate_dataset_names(self) -> list:
         """
-        Creates a list of required dataset names using start and end date from init function
+        Creates a list of required year-months using start and end date and months from init function
 
         Returns:
-            list: List of required datasets to download.
+            list: List of required year-months (yyyy-mm) to download.
         """
         month_list = pd.period_range(start=self.start_date, end=self.end_date, freq="M")
-        
-        return [month.strftime("%Y-%m.parquet") for month in month_list if month.strftime("%m") == '12' ]
+
+        return [month.strftime("%Y-%m") for month in month_list if month.strftime("%m") in self.months]
 
     def identify_required_datasets(self) -> list:
         """
-        Generates a list of datasets to download, if generated dataset name is in dataset list possible to download to.
+        Generates a list of datasets to download, resolving required year-months of each trip type in the dataset index.
 
         Returns:
             list: Final list of datasets to download.
@@ -95,12 +197,17 @@ class Scraper:
         all_possible_datasets_to_download = self.collect_all_datasets_to_download()
         required_datasets_names = self.generate_dataset_names()
 
-        for item in all_possible_datasets_to_download:
+        # dict keeps order and removes duplicates, list is rebuilt so repeated calls do not accumulate
+        datasets_to_download = {}
+        for trip_type in self.trip_types:
+            available_datasets = all_possible_datasets_to_download.get(trip_type, {})
             for dataset_name in required_datasets_names:
-                if dataset_name in item.split("_"):
-                    self._datasets_to_download.append(item)
-                else:
-                    pass
+                if dataset_name in available_datasets:
+                    datasets_to_download[available_datasets[dataset_name]] = None
+
+        self._datasets_to_download = list(datasets_to_download)
+
+        return self._datasets_to_download
 
     def download_required_datasets(self, path_to_raw_dataset_folder:str ='./raw_data') -> None:
         """
@@ -0,0 +1,110 @@
+import sys
+import json
+import time
+import importlib
+
+from contextlib import contextmanager
+
+# captured as early as possible, app.py imports this module first
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfiler:
+    """
+    Tracks per-module import time and named startup steps (e.g. model loading) of the API process.
+    """
+
+    def __init__(self, process_start: float = PROCESS_START) -> None:
+        """
+        Initialisation function.
+
+        Args:
+            process_start (float, optional): perf_counter value used as the start of the process. Defaults to PROCESS_START.
+        """
+        self.process_start = process_start
+        self.import_seconds = {}
+        self.step_seconds = {}
+        self.time_to_ready_seconds = None
+        self.failures = {}
+
+    def timed_import(self, module_name: str):
+        """
+        Imports module and records its import time, if it was not imported before.
+
+        Args:
+            module_name (str): Name of the module to import.
+
+        Returns:
+            module: imported module.
+        """
+        if module_name in sys.modules:
+            return sys.modules[module_name]
+
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.import_seconds[module_name] = time.perf_counter() - start
+
+        return module
+
+    @contextmanager
+    def track(self, step_name: str):
+        """
+        Context manager recording how long the wrapped startup step takes.
+
+        Args:
+            step_name (str): Name of the startup step, e.g. "model_load".
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.step_seconds[step_name] = time.perf_counter() - start
+
+    def record_failure(self, step_name: str, error: BaseException) -> None:
+        """
+        Records error of the startup step which prevented the API from becoming ready.
+
+        Args:
+            step_name (str): Name of the startup step, e.g. "warm_up".
+            error (BaseException): Error raised by the step.
+        """
+        self.failures[step_name] = repr(error)
+
+    def mark_ready(self) -> None:
+        """
+        Records time elapsed from process start until the API is ready to serve.
+        """
+        self.time_to_ready_seconds = time.perf_counter() - self.process_start
+
+    def report(self) -> dict:
+        """
+        Creates startup timing report.
+
+        Returns:
+            dict: import times, startup step times and time to ready in seconds, and failed startup steps.
+        """
+        return {
+            "imports": {name: round(seconds, 4) for name, seconds in self.import_seconds.items()},
+            "steps": {name: round(seconds, 4) for name, seconds in self.step_seconds.items()},
+            "time_to_ready_seconds": None
+            if self.time_to_ready_seconds is None
+            else round(self.time_to_ready_seconds, 4),
+            "failures": dict(self.failures),
+            "loaded_heavy_modules": [
+                name for name in ("pandas", "sklearn", "xgboost", "numpy") if name in sys.modules
+            ],
+        }
+
+    def emit_report(self, report_path: str = None) -> None:
+        """
+        Prints startup timing report and optionally saves it as json file.
+
+        Args:
+            report_path (str, optional): Path to save report to. Defaults to None.
+        """
+        report = self.report()
+        print(f"startup report: {json.dumps(report)}")
+
+        if report_path:
+            with open(report_path, "w") as handler:
+                json.dump(report, handler, indent=2)
@@ -0,0 +1,109 @@
+import os
+import threading
+import pytest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.scraper import Scraper
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "tlc_trip_record_data.html")
+ETAG = '"tlc-fixture-1"'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves TLC fixture page with ETag, answering conditional requests with 304.
+    """
+
+    statuses = []
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        with open(FIXTURE_PATH, "rb") as handler:
+            body = handler.read()
+
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    FixtureHandler.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/site/tlc/about/tlc-trip-record-data.page"
+    server.shutdown()
+    server.server_close()
+
+
+def make_scraper(url, tmp_path, **kwargs):
+    return Scraper(
+        general_url_for_monthly_data=url,
+        index_cache_path=str(tmp_path / "tlc_index_cache.json"),
+        request_timeout=5,
+        **kwargs,
+    )
+
+
+def test_index_parses_all_trip_types_and_resolves_relative_links(fixture_server, tmp_path):
+    index = make_scraper(fixture_server, tmp_path).collect_all_datasets_to_download()
+
+    root = fixture_server.split("/site/")[0]
+    assert index["yellow"] == {
+        "2021-12": "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2021-12.parquet",
+        "2021-11": "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2021-11.parquet",
+        "2020-12": "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2020-12.parquet",
+    }
+    assert index["green"] == {"2021-12": f"{root}/trip-data/green_tripdata_2021-12.parquet"}
+    assert index["fhv"] == {"2021-12": f"{root}/site/tlc/about/trip-data/fhv_tripdata_2021-12.parquet"}
+    assert index["fhvhv"] == {"2021-12": f"{root}/trip-data/fhvhv_tripdata_2021-12.parquet"}
+
+
+def test_unchanged_page_is_served_from_cache(fixture_server, tmp_path):
+    first_index = make_scraper(fixture_server, tmp_path).collect_all_datasets_to_download()
+    second_index = make_scraper(fixture_server, tmp_path).collect_all_datasets_to_download()
+
+    assert FixtureHandler.statuses == [200, 304]
+    assert second_index == first_index
+
+
+def test_unreachable_page_does_not_stop_discovery(fixture_server, tmp_path):
+    make_scraper(fixture_server, tmp_path).collect_all_datasets_to_download()
+
+    index = make_scraper(
+        fixture_server, tmp_path, additional_index_urls=["http://127.0.0.1:1/unreachable.page"]
+    ).collect_all_datasets_to_download()
+
+    assert set(index) == {"yellow", "green", "fhv", "fhvhv"}
+    assert os.path.isfile(tmp_path / "tlc_index_cache.json")
+
+
+def test_identify_required_datasets_is_deduplicated_across_calls(fixture_server, tmp_path):
+    scraper = make_scraper(
+        fixture_server,
+        tmp_path,
+        scraping_start_year="2020-01",
+        scraping_end_year="2021-12",
+        trip_types=["yellow", "green"],
+    )
+
+    first_call = scraper.identify_required_datasets()
+    second_call = scraper.identify_required_datasets()
+
+    assert first_call == second_call
+    assert len(first_call) == len(set(first_call)) == 3
+    assert all("_2021-11" not in dataset for dataset in first_call)